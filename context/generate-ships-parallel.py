@@ -0,0 +1,66 @@
+#
+# generate-ships-parallel.py - Parallel Starfighter Generator
+#
+# Splits the ship indices across several background Blender processes.
+# Each worker runs generate-ships.py on its own slice and writes to the same output folder.
+# Run: python generate-ships-parallel.py [--workers N] [--count N] [--blender PATH]
+#
+
+import sys
+import os
+import argparse
+import subprocess
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(DIR, 'generate-ships.py')
+NUM_SHIPS = 10
+
+def split_range(count, workers):
+    """Split range(count) into at most `workers` contiguous (start, end) slices"""
+    if count <= 0:
+        return []
+    workers = max(1, min(workers, count))
+    size, extra = divmod(count, workers)
+    slices = []
+    start = 0
+    for i in range(workers):
+        end = start + size + (1 if i < extra else 0)
+        slices.append((start, end))
+        start = end
+    return slices
+
+def run_worker(job):
+    blender, start, end = job
+    # Without --python-exit-code Blender exits 0 even when the script raises
+    cmd = [blender, '--background', '--python-exit-code', '1', '--python', SCRIPT, '--',
+           '--start', str(start), '--end', str(end)]
+    return subprocess.run(cmd).returncode
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate starfighter GLBs in parallel')
+    parser.add_argument('--workers', type=int, default=cpu_count(), help='number of Blender processes')
+    parser.add_argument('--count', type=int, default=NUM_SHIPS, help='number of ships to generate')
+    parser.add_argument('--blender', default='blender', help='path to the Blender executable')
+    args = parser.parse_args()
+    
+    jobs = [(args.blender, start, end) for start, end in split_range(args.count, args.workers)]
+    if not jobs:
+        print("Nothing to generate")
+        return
+    
+    # Workers only wait on their Blender subprocess, so threads are enough
+    with ThreadPool(len(jobs)) as pool:
+        codes = pool.map(run_worker, jobs)
+    
+    failed = [(start, end) for (_, start, end), code in zip(jobs, codes) if code != 0]
+    for start, end in failed:
+        print(f"Ships {start}-{end - 1} failed")
+    if failed:
+        sys.exit(1)
+    
+    print(f"\nDone! Generated {args.count} starfighters with {len(jobs)} workers")
+
+if __name__ == "__main__":
+    main()
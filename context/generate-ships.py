@@ -2,21 +2,29 @@
 # generate-ships.py - Starfighter Generator
 #
 # Generates compact starfighter-style ships with wings and engine nacelles
-# Run: blender --background --python generate-ships.py
+# Run: blender --background --python generate-ships.py [-- --start N --end M]
+# See generate-ships-parallel.py to split the ships across several Blender processes
 #
 
 import sys
 import os
+import argparse
 import bpy
 import bmesh
+import numpy as np
 from math import sqrt, radians, pi, cos, sin
 from mathutils import Vector, Matrix
-from random import random, seed, uniform, randint, randrange, choice
+from random import Random
 from enum import IntEnum
 from colorsys import hls_to_rgb
 
 DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_DIR = os.path.join(DIR, '..', 'public', 'ships')
+NUM_SHIPS = 10
+
+# Turn Z-aligned cones to lie along X, or to point up along Y
+ROT90Y = Matrix.Rotation(radians(90), 4, 'Y')
+ROT90X_NEG = Matrix.Rotation(radians(-90), 4, 'X')
 
 class Material(IntEnum):
     hull = 0
@@ -26,386 +34,525 @@ class Material(IntEnum):
     cockpit = 4
 
 def reset_scene():
-    bpy.ops.object.select_all(action='SELECT')
-    bpy.ops.object.delete()
-    for mat in bpy.data.materials:
-        if not mat.users:
-            bpy.data.materials.remove(mat)
+    """Remove the previous ship's objects and meshes, keeping the shared materials"""
+    bpy.data.batch_remove(ids=list(bpy.data.objects) + list(bpy.data.meshes))
 
 def create_materials():
-    ret = []
-    
-    # Base hull color - grays, whites, with slight tint
-    hull_hue = random()
-    hull_base = hls_to_rgb(hull_hue, uniform(0.4, 0.7), uniform(0.0, 0.15))
-    hull_base = (*hull_base, 1.0)
-    
-    # Accent color - more saturated
-    accent_hue = (hull_hue + uniform(0.05, 0.15)) % 1.0
-    accent_color = hls_to_rgb(accent_hue, uniform(0.4, 0.6), uniform(0.5, 0.8))
-    accent_color = (*accent_color, 1.0)
-    
-    # Engine glow
-    glow_hue = choice([0.0, 0.1, 0.55, 0.65])  # Red, orange, cyan, blue
-    glow_color = hls_to_rgb(glow_hue, 0.6, 1.0)
-    glow_color = (*glow_color, 1.0)
+    """Create the materials once; per-ship colors are set by randomize_materials"""
+    ret = {}
     
     for material in Material:
         mat = bpy.data.materials.new(name=material.name)
         mat.use_nodes = True
         bsdf = mat.node_tree.nodes.get('Principled BSDF')
+        # Look each socket up by name once per material
+        inputs = bsdf.inputs
+        base_color = inputs['Base Color']
+        metallic = inputs['Metallic']
+        roughness = inputs['Roughness']
+        emission_color = inputs['Emission Color']
+        emission_strength = inputs['Emission Strength']
+        color_sockets = [base_color]
         
         if material == Material.hull:
-            bsdf.inputs['Base Color'].default_value = hull_base
-            bsdf.inputs['Metallic'].default_value = 0.3
-            bsdf.inputs['Roughness'].default_value = 0.5
+            metallic.default_value = 0.3
+            roughness.default_value = 0.5
         elif material == Material.hull_accent:
-            bsdf.inputs['Base Color'].default_value = accent_color
-            bsdf.inputs['Metallic'].default_value = 0.2
-            bsdf.inputs['Roughness'].default_value = 0.4
+            metallic.default_value = 0.2
+            roughness.default_value = 0.4
         elif material == Material.hull_dark:
-            dark = tuple(c * 0.2 for c in hull_base[:3]) + (1.0,)
-            bsdf.inputs['Base Color'].default_value = dark
-            bsdf.inputs['Metallic'].default_value = 0.6
-            bsdf.inputs['Roughness'].default_value = 0.3
+            metallic.default_value = 0.6
+            roughness.default_value = 0.3
         elif material == Material.engine_glow:
-            bsdf.inputs['Base Color'].default_value = glow_color
-            bsdf.inputs['Emission Color'].default_value = glow_color
-            bsdf.inputs['Emission Strength'].default_value = 8.0
+            color_sockets.append(emission_color)
+            emission_strength.default_value = 8.0
         elif material == Material.cockpit:
-            bsdf.inputs['Base Color'].default_value = (0.1, 0.15, 0.2, 1.0)
-            bsdf.inputs['Metallic'].default_value = 0.9
-            bsdf.inputs['Roughness'].default_value = 0.1
+            base_color.default_value = (0.1, 0.15, 0.2, 1.0)
+            metallic.default_value = 0.9
+            roughness.default_value = 0.1
+            color_sockets = []
         
-        ret.append(mat)
+        ret[material] = (mat, color_sockets)
     return ret
 
-def add_to_mesh(bm, verts, material_index=0):
-    """Helper to set material on new faces"""
-    for v in verts:
-        for f in v.link_faces:
-            f.material_index = material_index
+def randomize_materials(materials, rng):
+    """Pick new hull/accent/glow colors for the cached materials"""
+    # One RGBA row each for hull, accent, dark hull and glow
+    colors = np.ones((4, 4), dtype=np.float32)
+    
+    # Base hull color - grays, whites, with slight tint
+    hull_hue = rng.random()
+    colors[0, :3] = hls_to_rgb(hull_hue, rng.uniform(0.4, 0.7), rng.uniform(0.0, 0.15))
+    
+    # Accent color - more saturated
+    accent_hue = (hull_hue + rng.uniform(0.05, 0.15)) % 1.0
+    colors[1, :3] = hls_to_rgb(accent_hue, rng.uniform(0.4, 0.6), rng.uniform(0.5, 0.8))
+    
+    # Dark trim from the hull color
+    colors[2, :3] = colors[0, :3] * 0.2
+    
+    # Engine glow
+    glow_hue = rng.choice([0.0, 0.1, 0.55, 0.65])  # Red, orange, cyan, blue
+    colors[3, :3] = hls_to_rgb(glow_hue, 0.6, 1.0)
+    
+    for material, color in zip((Material.hull, Material.hull_accent, Material.hull_dark, Material.engine_glow), colors):
+        for socket in materials[material][1]:
+            socket.default_value = color
+
+def scale_matrix(x, y, z):
+    """Per-axis 4x4 scale matrix"""
+    return Matrix.Diagonal((x, y, z, 1.0))
+
+def apply_matrix(verts, matrix):
+    """Transform an (n, 3) vertex array by a 4x4 mathutils Matrix"""
+    m = np.array(matrix, dtype=np.float32)
+    return verts @ m[:3, :3].T + m[:3, 3]
+
+def bmesh_arrays(bm):
+    """Flatten a bmesh into vertex, loop, face size and material arrays"""
+    bm.verts.index_update()
+    verts = np.array([v.co[:] for v in bm.verts], dtype=np.float32).reshape(-1, 3)
+    loops = np.array([v.index for f in bm.faces for v in f.verts], dtype=np.int32)
+    sizes = np.array([len(f.verts) for f in bm.faces], dtype=np.int32)
+    materials = np.array([f.material_index for f in bm.faces], dtype=np.int32)
+    return verts, loops, sizes, materials
+
+def set_face_material(faces, material_index):
+    """Helper to set material on bmesh faces, visiting each face once"""
+    for f in faces:
+        f.material_index = material_index
+
+def unit_cube():
+    """Unit cube matching bmesh.ops.create_cube(size=1)"""
+    verts = np.array([(x, y, z) for x in (-0.5, 0.5) for y in (-0.5, 0.5) for z in (-0.5, 0.5)],
+        dtype=np.float32)
+    faces = np.array([
+        (0, 1, 3, 2), (4, 6, 7, 5),  # -X, +X
+        (0, 4, 5, 1), (2, 3, 7, 6),  # -Y, +Y
+        (0, 2, 6, 4), (1, 5, 7, 3),  # -Z, +Z
+    ], dtype=np.int32)
+    return verts, faces.ravel(), np.full(len(faces), 4, dtype=np.int32)
+
+def unit_icosphere():
+    """Unit icosphere matching bmesh.ops.create_icosphere(subdivisions=2)"""
+    bm = bmesh.new()
+    bmesh.ops.create_icosphere(bm, subdivisions=2, radius=1.0)
+    verts, loops, sizes, _ = bmesh_arrays(bm)
+    bm.free()
+    return verts, loops, sizes
+
+CUBE = unit_cube()
+ICOSPHERE = unit_icosphere()
+
+def unit_ring(segments):
+    """Unit circle in the XY plane, ordered like bmesh.ops.create_cone"""
+    phi = np.arange(segments) * (2 * pi / segments)
+    return np.stack([np.sin(phi), np.cos(phi), np.zeros(segments)], axis=1).astype(np.float32)
+
+RINGS = {n: unit_ring(n) for n in (6, 8, 12, 32)}
+
+def cone(segments, radius1, radius2, depth, cap_ends=True):
+    """Cone along Z matching bmesh.ops.create_cone; a zero radius collapses to an apex"""
+    ring = RINGS[segments]
+    
+    idx = np.arange(segments, dtype=np.int32)
+    nxt = np.roll(idx, -1)
+    parts = []
+    faces = []
+    sizes = []
+    
+    if radius1 == 0:
+        parts.append(np.array([[0, 0, -depth / 2]], dtype=np.float32))
+        bottom = np.zeros(segments, dtype=np.int32)
+    else:
+        parts.append(ring * radius1 + (0, 0, -depth / 2))
+        bottom = idx
+    top_start = len(parts[0])
+    if radius2 == 0:
+        parts.append(np.array([[0, 0, depth / 2]], dtype=np.float32))
+        top = np.full(segments, top_start, dtype=np.int32)
+    else:
+        parts.append(ring * radius2 + (0, 0, depth / 2))
+        top = idx + top_start
+    
+    # Sides
+    if radius1 == 0:
+        faces.append(np.stack([bottom, top, top[nxt]], axis=1).ravel())
+        sizes.append(np.full(segments, 3, dtype=np.int32))
+    elif radius2 == 0:
+        faces.append(np.stack([bottom, top, bottom[nxt]], axis=1).ravel())
+        sizes.append(np.full(segments, 3, dtype=np.int32))
+    else:
+        faces.append(np.stack([bottom, top, top[nxt], bottom[nxt]], axis=1).ravel())
+        sizes.append(np.full(segments, 4, dtype=np.int32))
+    
+    # Caps
+    if cap_ends and radius1 != 0:
+        faces.append(bottom)
+        sizes.append(np.array([segments], dtype=np.int32))
+    if cap_ends and radius2 != 0:
+        faces.append(top[::-1])
+        sizes.append(np.array([segments], dtype=np.int32))
+    
+    return (np.concatenate(parts).astype(np.float32),
+            np.concatenate(faces).astype(np.int32),
+            np.concatenate(sizes))
+
+def prism(outline, thickness):
+    """Closed slab extruded along +Y from an outline wound counter-clockwise seen from +Y"""
+    n = len(outline)
+    verts = np.concatenate([outline, outline + (0, thickness, 0)]).astype(np.float32)
+    
+    idx = np.arange(n, dtype=np.int32)
+    nxt = np.roll(idx, -1)
+    sides = np.stack([idx, nxt, nxt + n, idx + n], axis=1).ravel()
+    loops = np.concatenate([idx[::-1], idx + n, sides])
+    sizes = np.array([n, n] + [4] * n, dtype=np.int32)
+    return verts, loops, sizes
+
+class MeshBatch:
+    """Collects ship geometry as arrays and uploads it to a mesh in one pass"""
+    
+    def __init__(self):
+        self.verts = []
+        self.loops = []
+        self.sizes = []
+        self.materials = []
+        self.num_verts = 0
+    
+    def append(self, verts, loops, sizes, materials):
+        self.verts.append(verts)
+        self.loops.append(loops + self.num_verts)
+        self.sizes.append(sizes)
+        self.materials.append(materials)
+        self.num_verts += len(verts)
+    
+    def add(self, primitive, material_index):
+        """Add a primitive as-is"""
+        verts, loops, sizes = primitive
+        materials = np.full(len(sizes), material_index, dtype=np.int32)
+        self.append(verts, loops, sizes, materials)
+    
+    def emit(self, primitive, matrix, material_index):
+        """Add a transformed copy of a primitive"""
+        verts, loops, sizes = primitive
+        self.add((apply_matrix(verts, matrix), loops, sizes), material_index)
+    
+    def emit_instances(self, primitive, matrix, offsets, material_index):
+        """Add one transformed copy of a primitive per row of offsets as a single chunk"""
+        verts, loops, sizes = primitive
+        verts = apply_matrix(verts, matrix)
+        count = len(offsets)
+        instances = (verts[None, :, :] + offsets[:, None, :]).reshape(-1, 3)
+        loops = (loops[None, :] + (np.arange(count, dtype=np.int32) * len(verts))[:, None]).ravel()
+        self.add((instances, loops, np.tile(sizes, count)), material_index)
+    
+    def add_bmesh(self, bm):
+        """Add free-form geometry built with bmesh"""
+        self.append(*bmesh_arrays(bm))
+    
+    def normalize(self, size):
+        """Center on the vertex centroid and fit the largest dimension to size"""
+        coords = np.concatenate(self.verts)
+        coords -= coords.mean(axis=0)
+        coords *= size / float((coords.max(axis=0) - coords.min(axis=0)).max())
+        self.verts = [coords]
+    
+    def to_mesh(self, me):
+        verts = np.concatenate(self.verts).astype(np.float32)
+        loops = np.concatenate(self.loops)
+        sizes = np.concatenate(self.sizes)
+        
+        me.vertices.add(len(verts))
+        me.vertices.foreach_set('co', verts.ravel())
+        me.loops.add(len(loops))
+        me.loops.foreach_set('vertex_index', loops)
+        me.polygons.add(len(sizes))
+        me.polygons.foreach_set('loop_start', np.cumsum(sizes, dtype=np.int32) - sizes)
+        me.polygons.foreach_set('material_index', np.concatenate(self.materials))
+        me.update(calc_edges=True)
 
-def create_fuselage(bm):
+def create_fuselage(batch, rng):
     """Create the main cockpit/fuselage body"""
-    style = choice(['pointed', 'rounded', 'angular', 'pod'])
+    style = rng.choice(['pointed', 'rounded', 'angular', 'pod'])
     
     if style == 'pointed':
         # Pointed nose like X-wing
-        length = uniform(1.5, 2.5)
-        width = uniform(0.4, 0.7)
-        height = uniform(0.3, 0.5)
+        length = rng.uniform(1.5, 2.5)
+        width = rng.uniform(0.4, 0.7)
+        height = rng.uniform(0.3, 0.5)
         
         # Main body
-        result = bmesh.ops.create_cone(bm, cap_ends=True, cap_tris=False,
-            segments=8, radius1=width*0.3, radius2=width, depth=length*0.6,
-            matrix=Matrix.Rotation(radians(90), 4, 'Y'))
-        add_to_mesh(bm, result['verts'], Material.hull)
+        batch.emit(cone(8, width*0.3, width, length*0.6),
+            ROT90Y, Material.hull)
         
         # Rear section
-        result = bmesh.ops.create_cone(bm, cap_ends=True, cap_tris=False,
-            segments=8, radius1=width, radius2=width*0.7, depth=length*0.4,
-            matrix=Matrix.Translation(Vector((-length*0.5, 0, 0))) @ Matrix.Rotation(radians(90), 4, 'Y'))
-        add_to_mesh(bm, result['verts'], Material.hull)
+        batch.emit(cone(8, width, width*0.7, length*0.4),
+            Matrix.Translation(Vector((-length*0.5, 0, 0))) @ ROT90Y,
+            Material.hull)
         
     elif style == 'rounded':
         # Rounded like Naboo starfighter
-        length = uniform(1.8, 2.8)
-        width = uniform(0.5, 0.8)
+        length = rng.uniform(1.8, 2.8)
+        width = rng.uniform(0.5, 0.8)
         
-        result = bmesh.ops.create_icosphere(bm, subdivisions=2, radius=width,
-            matrix=Matrix.Scale(length/width/2, 4, Vector((1,0,0))))
-        add_to_mesh(bm, result['verts'], Material.hull)
+        batch.emit(ICOSPHERE,
+            scale_matrix(length/2, width, width),
+            Material.hull)
         
     elif style == 'angular':
         # Angular like TIE cockpit ball but stretched
-        size = uniform(0.6, 1.0)
+        size = rng.uniform(0.6, 1.0)
+        bm = bmesh.new()
         bmesh.ops.create_cube(bm, size=size)
-        # Bevel edges for less blocky look
-        edges = [e for e in bm.edges]
-        bmesh.ops.bevel(bm, geom=edges, offset=size*0.1, segments=2)
-        for f in bm.faces:
-            f.material_index = Material.hull
+        set_face_material(bm.faces, Material.hull)
+        # Bevel edges for less blocky look, new faces copy the adjacent material
+        bmesh.ops.bevel(bm, geom=bm.edges, offset=size*0.1, segments=2)
+        batch.add_bmesh(bm)
+        bm.free()
             
     else:  # pod
         # Bubble cockpit like droid fighters
-        radius = uniform(0.5, 0.8)
-        result = bmesh.ops.create_icosphere(bm, subdivisions=2, radius=radius)
-        add_to_mesh(bm, result['verts'], Material.hull)
+        radius = rng.uniform(0.5, 0.8)
         
         # Stretch slightly
-        bmesh.ops.scale(bm, vec=Vector((uniform(1.2, 1.8), 1, 1)), verts=bm.verts)
+        batch.emit(ICOSPHERE,
+            scale_matrix(radius * rng.uniform(1.2, 1.8), radius, radius),
+            Material.hull)
     
     return style
 
-def add_cockpit_canopy(bm, fuselage_style):
+def add_cockpit_canopy(batch, rng, fuselage_style):
     """Add a cockpit canopy/window"""
-    if random() > 0.3:
-        canopy_size = uniform(0.2, 0.4)
-        y_offset = uniform(0.1, 0.25)
+    if rng.random() > 0.3:
+        canopy_size = rng.uniform(0.2, 0.4)
+        y_offset = rng.uniform(0.1, 0.25)
         
         if fuselage_style in ['pointed', 'rounded']:
-            result = bmesh.ops.create_icosphere(bm, subdivisions=2, radius=canopy_size,
-                matrix=Matrix.Translation(Vector((uniform(-0.2, 0.3), y_offset, 0))))
-            add_to_mesh(bm, result['verts'], Material.cockpit)
+            batch.emit(ICOSPHERE,
+                Matrix.Translation(Vector((rng.uniform(-0.2, 0.3), y_offset, 0))) @ Matrix.Scale(canopy_size, 4),
+                Material.cockpit)
         else:
-            result = bmesh.ops.create_cube(bm, size=canopy_size*1.5,
-                matrix=Matrix.Translation(Vector((0, y_offset, 0))))
-            add_to_mesh(bm, result['verts'], Material.cockpit)
+            batch.emit(CUBE,
+                Matrix.Translation(Vector((0, y_offset, 0))) @ Matrix.Scale(canopy_size*1.5, 4),
+                Material.cockpit)
 
-def add_wings(bm):
+def add_wings(batch, rng):
     """Add wings - the key starfighter feature"""
-    wing_style = choice(['x-wing', 'swept', 'delta', 'vertical', 'ring', 'stub'])
+    wing_style = rng.choice(['x-wing', 'swept', 'delta', 'vertical', 'ring', 'stub'])
     
     if wing_style == 'x-wing':
         # Four wings in X pattern
-        wing_length = uniform(1.5, 2.5)
-        wing_width = uniform(0.6, 1.0)
-        wing_thickness = uniform(0.03, 0.08)
-        spread_angle = uniform(15, 35)
+        wing_length = rng.uniform(1.5, 2.5)
+        wing_width = rng.uniform(0.6, 1.0)
+        wing_thickness = rng.uniform(0.03, 0.08)
+        spread_angle = rng.uniform(15, 35)
         
         for i in range(4):
             angle = spread_angle if i < 2 else -spread_angle
             y_sign = 1 if i % 2 == 0 else -1
             
-            # Wing panel
-            result = bmesh.ops.create_cube(bm, size=1,
-                matrix=Matrix.Translation(Vector((uniform(-0.3, 0.1), 0, wing_length/2))) @
-                       Matrix.Scale(wing_width, 4, Vector((1,0,0))) @
-                       Matrix.Scale(wing_thickness, 4, Vector((0,1,0))) @
-                       Matrix.Scale(wing_length, 4, Vector((0,0,1))))
-            
-            # Position and rotate
-            bmesh.ops.rotate(bm, verts=result['verts'], cent=(0,0,0),
-                matrix=Matrix.Rotation(radians(angle * y_sign), 3, 'X'))
-            bmesh.ops.translate(bm, verts=result['verts'], vec=Vector((0, 0, 0)))
-            
-            add_to_mesh(bm, result['verts'], Material.hull if i % 2 == 0 else Material.hull_accent)
+            # Wing panel, rotated into position
+            batch.emit(CUBE,
+                Matrix.Rotation(radians(angle * y_sign), 4, 'X') @
+                Matrix.Translation(Vector((rng.uniform(-0.3, 0.1), 0, wing_length/2))) @
+                scale_matrix(wing_width, wing_thickness, wing_length),
+                Material.hull if i % 2 == 0 else Material.hull_accent)
             
     elif wing_style == 'swept':
         # Swept back wings like a jet
-        wing_length = uniform(1.2, 2.0)
-        wing_width = uniform(0.8, 1.4)
-        sweep = uniform(0.3, 0.7)
+        wing_length = rng.uniform(1.2, 2.0)
+        wing_width = rng.uniform(0.8, 1.4)
+        sweep = rng.uniform(0.3, 0.7)
         
         for side in [-1, 1]:
-            verts = [
-                bm.verts.new((0, 0, 0.2 * side)),
-                bm.verts.new((-wing_width * sweep, 0, wing_length * side)),
-                bm.verts.new((wing_width * (1-sweep), 0, wing_length * side)),
-                bm.verts.new((wing_width * 0.3, 0, 0.3 * side)),
-            ]
-            face = bm.faces.new(verts if side > 0 else reversed(verts))
-            face.material_index = Material.hull_accent
+            outline = np.array([
+                (0, 0, 0.2 * side),
+                (-wing_width * sweep, 0, wing_length * side),
+                (wing_width * (1-sweep), 0, wing_length * side),
+                (wing_width * 0.3, 0, 0.3 * side),
+            ], dtype=np.float32)
             
             # Extrude for thickness
-            result = bmesh.ops.extrude_face_region(bm, geom=[face])
-            bmesh.ops.translate(bm, verts=[v for v in result['geom'] if isinstance(v, bmesh.types.BMVert)],
-                vec=Vector((0, uniform(0.03, 0.08), 0)))
+            batch.add(prism(outline if side > 0 else outline[::-1], rng.uniform(0.03, 0.08)),
+                Material.hull_accent)
                 
     elif wing_style == 'delta':
         # Delta/triangle wings
-        wing_span = uniform(1.5, 2.5)
-        wing_length = uniform(1.0, 1.8)
+        wing_span = rng.uniform(1.5, 2.5)
+        wing_length = rng.uniform(1.0, 1.8)
         
         for side in [-1, 1]:
-            verts = [
-                bm.verts.new((wing_length * 0.5, 0, 0)),
-                bm.verts.new((-wing_length * 0.5, 0, wing_span * 0.5 * side)),
-                bm.verts.new((-wing_length * 0.3, 0, 0.1 * side)),
-            ]
-            face = bm.faces.new(verts if side > 0 else reversed(verts))
-            face.material_index = Material.hull_accent
+            outline = np.array([
+                (wing_length * 0.5, 0, 0),
+                (-wing_length * 0.5, 0, wing_span * 0.5 * side),
+                (-wing_length * 0.3, 0, 0.1 * side),
+            ], dtype=np.float32)
             
-            result = bmesh.ops.extrude_face_region(bm, geom=[face])
-            bmesh.ops.translate(bm, verts=[v for v in result['geom'] if isinstance(v, bmesh.types.BMVert)],
-                vec=Vector((0, uniform(0.04, 0.1), 0)))
+            batch.add(prism(outline if side < 0 else outline[::-1], rng.uniform(0.04, 0.1)),
+                Material.hull_accent)
                 
     elif wing_style == 'vertical':
         # Vertical wings like TIE fighters
-        wing_height = uniform(1.5, 2.5)
-        wing_width = uniform(1.0, 1.8)
+        wing_height = rng.uniform(1.5, 2.5)
+        wing_width = rng.uniform(1.0, 1.8)
         
         for side in [-1, 1]:
             # Hexagonal or rectangular panel
-            if random() > 0.5:
+            if rng.random() > 0.5:
                 # Hexagonal
-                result = bmesh.ops.create_cone(bm, cap_ends=True, cap_tris=False,
-                    segments=6, radius1=wing_height*0.5, radius2=wing_height*0.5, depth=0.05,
-                    matrix=Matrix.Translation(Vector((0, 0, wing_width * 0.6 * side))) @
-                           Matrix.Rotation(radians(90), 4, 'Y'))
+                batch.emit(cone(6, wing_height*0.5, wing_height*0.5, 0.05),
+                    Matrix.Translation(Vector((0, 0, wing_width * 0.6 * side))) @ ROT90Y,
+                    Material.hull_dark)
             else:
                 # Rectangular
-                result = bmesh.ops.create_cube(bm, size=1,
-                    matrix=Matrix.Translation(Vector((0, 0, wing_width * 0.6 * side))) @
-                           Matrix.Scale(0.05, 4, Vector((0,0,1))) @
-                           Matrix.Scale(wing_height, 4, Vector((0,1,0))) @
-                           Matrix.Scale(wing_width * 0.8, 4, Vector((1,0,0))))
-            add_to_mesh(bm, result['verts'], Material.hull_dark)
+                batch.emit(CUBE,
+                    Matrix.Translation(Vector((0, 0, wing_width * 0.6 * side))) @
+                    scale_matrix(wing_width * 0.8, wing_height, 0.05),
+                    Material.hull_dark)
             
             # Wing strut
-            result = bmesh.ops.create_cube(bm, size=1,
-                matrix=Matrix.Translation(Vector((0, 0, wing_width * 0.3 * side))) @
-                       Matrix.Scale(0.1, 4, Vector((1,0,0))) @
-                       Matrix.Scale(0.1, 4, Vector((0,1,0))) @
-                       Matrix.Scale(wing_width * 0.3, 4, Vector((0,0,1))))
-            add_to_mesh(bm, result['verts'], Material.hull)
+            batch.emit(CUBE,
+                Matrix.Translation(Vector((0, 0, wing_width * 0.3 * side))) @
+                scale_matrix(0.1, 0.1, wing_width * 0.3),
+                Material.hull)
             
     elif wing_style == 'ring':
         # Ring wing like Jedi starfighter hyperdrive ring
-        ring_radius = uniform(1.2, 2.0)
-        ring_thickness = uniform(0.1, 0.2)
+        ring_radius = rng.uniform(1.2, 2.0)
+        ring_thickness = rng.uniform(0.1, 0.2)
         
-        result = bmesh.ops.create_cone(bm, cap_ends=False, cap_tris=False,
-            segments=32, radius1=ring_radius, radius2=ring_radius, depth=ring_thickness,
-            matrix=Matrix.Rotation(radians(90), 4, 'Y'))
-        add_to_mesh(bm, result['verts'], Material.hull_accent)
+        batch.emit(cone(32, ring_radius, ring_radius, ring_thickness, cap_ends=False),
+            ROT90Y, Material.hull_accent)
         
         # Inner ring
-        result = bmesh.ops.create_cone(bm, cap_ends=False, cap_tris=False,
-            segments=32, radius1=ring_radius*0.85, radius2=ring_radius*0.85, depth=ring_thickness*1.5,
-            matrix=Matrix.Rotation(radians(90), 4, 'Y'))
-        add_to_mesh(bm, result['verts'], Material.hull_dark)
+        batch.emit(cone(32, ring_radius*0.85, ring_radius*0.85, ring_thickness*1.5, cap_ends=False),
+            ROT90Y, Material.hull_dark)
         
     else:  # stub
         # Small stub wings
-        wing_length = uniform(0.5, 0.8)
+        wing_length = rng.uniform(0.5, 0.8)
         
         for side in [-1, 1]:
-            result = bmesh.ops.create_cube(bm, size=1,
-                matrix=Matrix.Translation(Vector((uniform(-0.2, 0.2), 0, wing_length * 0.6 * side))) @
-                       Matrix.Scale(uniform(0.4, 0.7), 4, Vector((1,0,0))) @
-                       Matrix.Scale(uniform(0.05, 0.12), 4, Vector((0,1,0))) @
-                       Matrix.Scale(wing_length, 4, Vector((0,0,1))))
-            add_to_mesh(bm, result['verts'], Material.hull_accent)
+            batch.emit(CUBE,
+                Matrix.Translation(Vector((rng.uniform(-0.2, 0.2), 0, wing_length * 0.6 * side))) @
+                scale_matrix(rng.uniform(0.4, 0.7), rng.uniform(0.05, 0.12), wing_length),
+                Material.hull_accent)
     
     return wing_style
 
-def add_engines(bm, wing_style):
+def add_engines(batch, rng, wing_style):
     """Add engine nacelles"""
-    engine_style = choice(['rear', 'wing_tip', 'pod', 'central'])
-    
-    engine_radius = uniform(0.1, 0.25)
-    engine_length = uniform(0.3, 0.6)
+    engine_style = rng.choice(['rear', 'wing_tip', 'pod', 'central'])
     
-    positions = []
+    engine_radius = rng.uniform(0.1, 0.25)
+    engine_length = rng.uniform(0.3, 0.6)
     
     if engine_style == 'rear' or wing_style == 'vertical':
         # Engines at rear of fuselage
-        num_engines = choice([1, 2, 3])
+        num_engines = rng.choice([1, 2, 3])
         spacing = 0.25
-        for i in range(num_engines):
-            z_off = (i - (num_engines-1)/2) * spacing
-            positions.append(Vector((-0.8, 0, z_off)))
+        positions = [(-0.8, 0, (i - (num_engines-1)/2) * spacing) for i in range(num_engines)]
             
     elif engine_style == 'wing_tip':
         # Engines at wing tips
-        wing_span = uniform(1.0, 1.8)
+        wing_span = rng.uniform(1.0, 1.8)
         positions = [
-            Vector((uniform(-0.3, 0.1), 0, wing_span)),
-            Vector((uniform(-0.3, 0.1), 0, -wing_span)),
+            (rng.uniform(-0.3, 0.1), 0, wing_span),
+            (rng.uniform(-0.3, 0.1), 0, -wing_span),
         ]
-        if random() > 0.5:  # Maybe 4 engines
+        if rng.random() > 0.5:  # Maybe 4 engines
             positions.extend([
-                Vector((uniform(-0.3, 0.1), wing_span * 0.3, wing_span * 0.5)),
-                Vector((uniform(-0.3, 0.1), -wing_span * 0.3, wing_span * 0.5)),
-                Vector((uniform(-0.3, 0.1), wing_span * 0.3, -wing_span * 0.5)),
-                Vector((uniform(-0.3, 0.1), -wing_span * 0.3, -wing_span * 0.5)),
+                (rng.uniform(-0.3, 0.1), wing_span * 0.3, wing_span * 0.5),
+                (rng.uniform(-0.3, 0.1), -wing_span * 0.3, wing_span * 0.5),
+                (rng.uniform(-0.3, 0.1), wing_span * 0.3, -wing_span * 0.5),
+                (rng.uniform(-0.3, 0.1), -wing_span * 0.3, -wing_span * 0.5),
             ])
             
     elif engine_style == 'pod':
         # Engine pods on sides
-        pod_offset = uniform(0.5, 0.9)
+        pod_offset = rng.uniform(0.5, 0.9)
         positions = [
-            Vector((-0.3, 0, pod_offset)),
-            Vector((-0.3, 0, -pod_offset)),
+            (-0.3, 0, pod_offset),
+            (-0.3, 0, -pod_offset),
         ]
         engine_radius *= 1.5
         engine_length *= 1.5
         
     else:  # central
-        positions = [Vector((-0.7, 0, 0))]
+        positions = [(-0.7, 0, 0)]
         engine_radius *= 2
         engine_length *= 1.5
     
-    for pos in positions:
-        # Engine housing
-        result = bmesh.ops.create_cone(bm, cap_ends=True, cap_tris=False,
-            segments=12, radius1=engine_radius, radius2=engine_radius * 0.8, depth=engine_length,
-            matrix=Matrix.Translation(pos) @ Matrix.Rotation(radians(90), 4, 'Y'))
-        add_to_mesh(bm, result['verts'], Material.hull_dark)
-        
-        # Engine glow
-        result = bmesh.ops.create_cone(bm, cap_ends=True, cap_tris=False,
-            segments=12, radius1=engine_radius * 0.7, radius2=engine_radius * 0.5, depth=engine_length * 0.3,
-            matrix=Matrix.Translation(pos + Vector((-engine_length*0.5, 0, 0))) @ Matrix.Rotation(radians(90), 4, 'Y'))
-        add_to_mesh(bm, result['verts'], Material.engine_glow)
+    positions = np.array(positions, dtype=np.float32)
+    
+    # Engine housing
+    batch.emit_instances(cone(12, engine_radius, engine_radius * 0.8, engine_length),
+        ROT90Y, positions, Material.hull_dark)
+    
+    # Engine glow
+    batch.emit_instances(cone(12, engine_radius * 0.7, engine_radius * 0.5, engine_length * 0.3),
+        Matrix.Translation(Vector((-engine_length*0.5, 0, 0))) @ ROT90Y, positions, Material.engine_glow)
 
-def add_details(bm):
+def add_details(batch, rng):
     """Add small details like guns, sensors"""
     # Nose guns
-    if random() > 0.4:
-        gun_length = uniform(0.4, 0.8)
-        gun_radius = uniform(0.02, 0.05)
-        gun_spread = uniform(0.15, 0.35)
+    if rng.random() > 0.4:
+        gun_length = rng.uniform(0.4, 0.8)
+        gun_radius = rng.uniform(0.02, 0.05)
+        gun_spread = rng.uniform(0.15, 0.35)
         
         for side in [-1, 1]:
-            result = bmesh.ops.create_cone(bm, cap_ends=True, cap_tris=False,
-                segments=6, radius1=gun_radius, radius2=gun_radius, depth=gun_length,
-                matrix=Matrix.Translation(Vector((gun_length/2 + 0.5, 0, gun_spread * side))) @
-                       Matrix.Rotation(radians(90), 4, 'Y'))
-            add_to_mesh(bm, result['verts'], Material.hull_dark)
+            batch.emit(cone(6, gun_radius, gun_radius, gun_length),
+                Matrix.Translation(Vector((gun_length/2 + 0.5, 0, gun_spread * side))) @ ROT90Y,
+                Material.hull_dark)
     
     # Wing-mounted weapons
-    if random() > 0.5:
+    if rng.random() > 0.5:
         for side in [-1, 1]:
-            pos = Vector((uniform(0, 0.5), 0, uniform(0.8, 1.5) * side))
-            result = bmesh.ops.create_cone(bm, cap_ends=True, cap_tris=False,
-                segments=6, radius1=0.03, radius2=0.03, depth=0.5,
-                matrix=Matrix.Translation(pos) @ Matrix.Rotation(radians(90), 4, 'Y'))
-            add_to_mesh(bm, result['verts'], Material.hull_dark)
+            pos = Vector((rng.uniform(0, 0.5), 0, rng.uniform(0.8, 1.5) * side))
+            batch.emit(cone(6, 0.03, 0.03, 0.5),
+                Matrix.Translation(pos) @ ROT90Y,
+                Material.hull_dark)
     
     # Sensor dish or antenna
-    if random() > 0.6:
-        result = bmesh.ops.create_cone(bm, cap_ends=True, cap_tris=False,
-            segments=8, radius1=0.0, radius2=0.1, depth=0.15,
-            matrix=Matrix.Translation(Vector((0.3, 0.3, 0))) @ Matrix.Rotation(radians(-90), 4, 'X'))
-        add_to_mesh(bm, result['verts'], Material.hull_accent)
+    if rng.random() > 0.6:
+        batch.emit(cone(8, 0.0, 0.1, 0.15),
+            Matrix.Translation(Vector((0.3, 0.3, 0))) @ ROT90X_NEG,
+            Material.hull_accent)
 
-def generate_starfighter(random_seed=''):
-    if random_seed:
-        seed(random_seed)
+def generate_starfighter(materials, random_seed=''):
+    rng = Random(random_seed or None)
     
-    bm = bmesh.new()
+    batch = MeshBatch()
     
     # Build the ship
-    fuselage_style = create_fuselage(bm)
-    add_cockpit_canopy(bm, fuselage_style)
-    wing_style = add_wings(bm)
-    add_engines(bm, wing_style)
-    add_details(bm)
+    fuselage_style = create_fuselage(batch, rng)
+    add_cockpit_canopy(batch, rng, fuselage_style)
+    wing_style = add_wings(batch, rng)
+    add_engines(batch, rng, wing_style)
+    add_details(batch, rng)
+    
+    # Center and normalize scale
+    batch.normalize(1.5)
     
     # Create mesh
     me = bpy.data.meshes.new('Starfighter')
-    bm.to_mesh(me)
-    bm.free()
-    
-    obj = bpy.data.objects.new('Starfighter', me)
-    bpy.context.scene.collection.objects.link(obj)
-    bpy.context.view_layer.objects.active = obj
-    obj.select_set(True)
-    
-    # Center and orient
-    bpy.ops.object.origin_set(type='ORIGIN_CENTER_OF_MASS')
-    obj.location = (0, 0, 0)
+    batch.to_mesh(me)
     
     # Add materials
-    materials = create_materials()
-    for mat in materials:
+    randomize_materials(materials, rng)
+    for mat, _ in materials.values():
         me.materials.append(mat)
     
     # Smooth shading
-    bpy.ops.object.shade_smooth()
+    me.polygons.foreach_set('use_smooth', [True] * len(me.polygons))
+    
+    # Only touch the scene once the mesh is complete
+    obj = bpy.data.objects.new('Starfighter', me)
+    bpy.context.scene.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+    obj.select_set(True)
     
     return obj
 
@@ -414,36 +561,31 @@ def export_glb(filepath):
         filepath=filepath,
         export_format='GLB',
         use_selection=True,
-        export_apply=True,
+        export_apply=False,
         export_materials='EXPORT'
     )
 
+def parse_args():
+    """Parse the arguments passed to the script after Blender's own '--'"""
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description='Generate starfighter GLBs')
+    parser.add_argument('--start', type=int, default=0, help='first ship index')
+    parser.add_argument('--end', type=int, default=NUM_SHIPS, help='ship index to stop before')
+    return parser.parse_args(argv)
+
 def main():
+    args = parse_args()
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     
-    num_ships = 10
+    num_ships = args.end - args.start
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    materials = create_materials()
     
-    for i in range(num_ships):
-        print(f"Generating starfighter {i + 1}/{num_ships}...")
+    for i in range(args.start, args.end):
+        print(f"Generating starfighter {i + 1}/{args.end}...")
         reset_scene()
         
-        obj = generate_starfighter(random_seed=str(i * 7777 + 42))
-        
-        # Normalize scale
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
-        
-        bbox = [obj.matrix_world @ Vector(corner) for corner in obj.bound_box]
-        dims = Vector((
-            max(v.x for v in bbox) - min(v.x for v in bbox),
-            max(v.y for v in bbox) - min(v.y for v in bbox),
-            max(v.z for v in bbox) - min(v.z for v in bbox)
-        ))
-        max_dim = max(dims)
-        scale_factor = 1.5 / max_dim
-        obj.scale *= scale_factor
-        bpy.ops.object.transform_apply(scale=True)
+        generate_starfighter(materials, random_seed=str(i * 7777 + 42))
         
         output_path = os.path.join(OUTPUT_DIR, f'enemy-ship-{i}.glb')
         export_glb(output_path)